@@ -2,13 +2,14 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Tuple
 
 import pandas as pd
 import streamlit as st
 
 from logic_core import (
 	Atom,
+	Formula,
 	ForwardResult,
 	Rule,
 	backward_chain,
@@ -23,11 +24,13 @@ BASE_DIR = Path(__file__).parent
 DEFAULT_RULES_PATH = BASE_DIR / "rules.json"
 
 
-def load_rule_sets() -> Dict[str, List[Rule]]:
+@st.cache_resource(show_spinner=False)
+def _load_rule_sets_cached(path_str: str, mtime: float) -> Dict[str, List[Rule]]:
 	from logic_core import load_rules_from_json
 
-	if DEFAULT_RULES_PATH.exists():
-		data = json.loads(DEFAULT_RULES_PATH.read_text(encoding="utf8"))
+	path = Path(path_str)
+	if path.exists():
+		data = json.loads(path.read_text(encoding="utf8"))
 	else:
 		data = {"medical": [], "loan": []}
 	return {
@@ -36,12 +39,37 @@ def load_rule_sets() -> Dict[str, List[Rule]]:
 	}
 
 
-def collect_atoms_from_rules(rules: List[Rule]) -> List[str]:
+def load_rule_sets() -> Dict[str, List[Rule]]:
+	path = DEFAULT_RULES_PATH
+	mtime = path.stat().st_mtime if path.exists() else 0.0
+	return _load_rule_sets_cached(str(path), mtime)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _collect_atoms_cached(signature: Tuple[str, ...], _formulas: Tuple[Formula, ...]) -> Tuple[str, ...]:
+	# Keyed on the formatted formulas only; Streamlit skips hashing "_" arguments.
 	atoms: Set[str] = set()
-	for r in rules:
-		atoms |= r.premise.atoms()
-		atoms |= r.conclusion.atoms()
-	return sorted(atoms)
+	for f in _formulas:
+		atoms |= f.atoms()
+	return tuple(sorted(atoms))
+
+
+def collect_atoms_from_rules(rules: List[Rule]) -> List[str]:
+	formulas = tuple(f for r in rules for f in (r.premise, r.conclusion))
+	signature = tuple(formula_to_str(f) for f in formulas)
+	return list(_collect_atoms_cached(signature, formulas))
+
+
+def _rule_rows(rules: List[Rule]) -> Tuple[Tuple[str, str, str, str], ...]:
+	return tuple(
+		(r.id, formula_to_str(r.premise), formula_to_str(r.conclusion), r.description)
+		for r in rules
+	)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _build_rules_df(rows: Tuple[Tuple[str, str, str, str], ...]) -> pd.DataFrame:
+	return pd.DataFrame(list(rows), columns=["ID", "Premise", "Conclusion", "Text"])
 
 
 def render_forward_result(result: ForwardResult) -> None:
@@ -82,13 +110,19 @@ def render_forward_result(result: ForwardResult) -> None:
 
 
 def render_proof_tree(node) -> None:
+	lines: List[str] = []
+	stack = [(node, 0)]
+	while stack:
+		current, depth = stack.pop()
+		status = "success" if current.succeeded else "failure"
+		rule = f" Rule used: {current.rule_id}." if current.rule_id else ""
+		lines.append(f"{'  ' * depth}- **Goal: {current.goal}** ({status}): {current.message}{rule}")
+		for child in reversed(current.premises):
+			stack.append((child, depth + 1))
+
 	label = f"Goal: {node.goal} (success)" if node.succeeded else f"Goal: {node.goal} (failure)"
 	with st.expander(label, expanded=node.succeeded):
-		st.write(node.message)
-		if node.rule_id:
-			st.write(f"Rule used: {node.rule_id}")
-		for child in node.premises:
-			render_proof_tree(child)
+		st.markdown("\n".join(lines))
 
 
 def main() -> None:
@@ -225,17 +259,7 @@ def main() -> None:
 	with tab_rules:
 		st.subheader("Rules")
 		if rules:
-			rules_df = pd.DataFrame(
-				[
-					{
-						"ID": r.id,
-						"Premise": formula_to_str(r.premise),
-						"Conclusion": formula_to_str(r.conclusion),
-						"Text": r.description,
-					}
-					for r in rules
-				]
-			)
+			rules_df = _build_rules_df(_rule_rows(rules))
 			st.dataframe(rules_df, width='stretch')
 		else:
 			st.info("No rules loaded for this domain.")
@@ -269,12 +293,12 @@ def main() -> None:
 				"domain": selected_domain,
 				"rules": [
 					{
-						"id": r.id,
-						"premise": formula_to_str(r.premise),
-						"conclusion": formula_to_str(r.conclusion),
-						"text": r.description,
+						"id": rule_id,
+						"premise": premise,
+						"conclusion": conclusion,
+						"text": text,
 					}
-					for r in rules
+					for rule_id, premise, conclusion, text in _rule_rows(rules)
 				],
 			}
 			st.download_button(
@@ -1,109 +1,383 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from itertools import product
-from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+import heapq
+import sys
+import weakref
+from dataclasses import dataclass, field, fields
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
 
+import numpy as np
 import pandas as pd
 
-
-class Formula:
-	def atoms(self) -> Set[str]:
-		raise NotImplementedError
+try:
+	from numba import njit
+except ImportError:  # pragma: no cover - numba is optional
+	njit = None
 
 
-@dataclass(frozen=True)
+class Formula:
+	# Empty so the slotted node dataclasses below carry no per-instance __dict__.
+	__slots__ = ()
+
+	def atoms(self) -> FrozenSet[str]:
+		return self._atoms
+
+	def __hash__(self) -> int:
+		# Built bottom-up in __post_init__, so hashing deep trees never recurses.
+		return self._hash
+
+	def __eq__(self, other: object) -> bool:
+		if self is other:
+			return True
+		if other.__class__ is not self.__class__:
+			return NotImplemented
+		# Walks both trees with an explicit stack, so comparing deep trees never
+		# recurses; the cached hashes reject most mismatches at the root.
+		stack = [(self, other)]
+		while stack:
+			a, b = stack.pop()
+			if a is b:
+				continue
+			cls = type(a)
+			if cls is not type(b) or a._hash != b._hash:
+				return False
+			if cls is Atom:
+				if a.name != b.name:
+					return False
+			elif cls is Not:
+				stack.append((a.operand, b.operand))
+			else:
+				stack.append((a.right, b.right))
+				stack.append((a.left, b.left))
+		return True
+
+	def __reduce__(self):
+		# Cached atoms and closures are rebuilt by __init__ rather than pickled.
+		return type(self), tuple(getattr(self, f.name) for f in fields(self) if f.init)
+
+
+def _cheaper_first(left: Formula, right: Formula) -> Tuple[Formula, Formula]:
+	# Order operands of a short-circuiting connective so the side reading fewer
+	# atoms is evaluated first; ties keep the written order.
+	if len(right.atoms()) < len(left.atoms()):
+		return right, left
+	return left, right
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class Atom(Formula):
+	_PREC = 7
+
 	name: str
+	_atoms: FrozenSet[str] = field(init=False, repr=False, compare=False)
+	_eval: Callable[[Dict[str, bool]], bool] = field(init=False, repr=False, compare=False)
+	_hash: int = field(init=False, repr=False, compare=False)
+
+	__eq__ = Formula.__eq__
+	__hash__ = Formula.__hash__
 
-	def atoms(self) -> Set[str]:
-		return {self.name}
+	def __post_init__(self) -> None:
+		object.__setattr__(self, "_hash", hash((Atom, self.name)))
+		object.__setattr__(self, "_atoms", frozenset((self.name,)))
+		object.__setattr__(self, "_eval", lambda a, n=self.name: bool(a.get(n, False)))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Not(Formula):
+	_PREC = 6
+
 	operand: Formula
+	_atoms: FrozenSet[str] = field(init=False, repr=False, compare=False)
+	_eval: Callable[[Dict[str, bool]], bool] = field(init=False, repr=False, compare=False)
+	_hash: int = field(init=False, repr=False, compare=False)
+
+	__eq__ = Formula.__eq__
+	__hash__ = Formula.__hash__
 
-	def atoms(self) -> Set[str]:
-		return self.operand.atoms()
+	def __post_init__(self) -> None:
+		object.__setattr__(self, "_hash", hash((Not, self.operand._hash)))
+		object.__setattr__(self, "_atoms", self.operand.atoms())
+		object.__setattr__(self, "_eval", lambda a, o=self.operand._eval: not o(a))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class And(Formula):
+	_PREC = 5
+
 	left: Formula
 	right: Formula
+	_atoms: FrozenSet[str] = field(init=False, repr=False, compare=False)
+	_eval: Callable[[Dict[str, bool]], bool] = field(init=False, repr=False, compare=False)
+	_hash: int = field(init=False, repr=False, compare=False)
 
-	def atoms(self) -> Set[str]:
-		return self.left.atoms() | self.right.atoms()
+	__eq__ = Formula.__eq__
+	__hash__ = Formula.__hash__
 
+	def __post_init__(self) -> None:
+		object.__setattr__(self, "_hash", hash((And, self.left._hash, self.right._hash)))
+		object.__setattr__(self, "_atoms", self.left.atoms() | self.right.atoms())
+		first, second = _cheaper_first(self.left, self.right)
+		object.__setattr__(self, "_eval", lambda a, lhs=first._eval, rhs=second._eval: lhs(a) and rhs(a))
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Or(Formula):
+	_PREC = 3
+
 	left: Formula
 	right: Formula
+	_atoms: FrozenSet[str] = field(init=False, repr=False, compare=False)
+	_eval: Callable[[Dict[str, bool]], bool] = field(init=False, repr=False, compare=False)
+	_hash: int = field(init=False, repr=False, compare=False)
+
+	__eq__ = Formula.__eq__
+	__hash__ = Formula.__hash__
 
-	def atoms(self) -> Set[str]:
-		return self.left.atoms() | self.right.atoms()
+	def __post_init__(self) -> None:
+		object.__setattr__(self, "_hash", hash((Or, self.left._hash, self.right._hash)))
+		object.__setattr__(self, "_atoms", self.left.atoms() | self.right.atoms())
+		first, second = _cheaper_first(self.left, self.right)
+		object.__setattr__(self, "_eval", lambda a, lhs=first._eval, rhs=second._eval: lhs(a) or rhs(a))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Xor(Formula):
+	_PREC = 4
+
 	left: Formula
 	right: Formula
+	_atoms: FrozenSet[str] = field(init=False, repr=False, compare=False)
+	_eval: Callable[[Dict[str, bool]], bool] = field(init=False, repr=False, compare=False)
+	_hash: int = field(init=False, repr=False, compare=False)
+
+	__eq__ = Formula.__eq__
+	__hash__ = Formula.__hash__
 
-	def atoms(self) -> Set[str]:
-		return self.left.atoms() | self.right.atoms()
+	def __post_init__(self) -> None:
+		object.__setattr__(self, "_hash", hash((Xor, self.left._hash, self.right._hash)))
+		object.__setattr__(self, "_atoms", self.left.atoms() | self.right.atoms())
+		object.__setattr__(self, "_eval", lambda a, lhs=self.left._eval, rhs=self.right._eval: lhs(a) != rhs(a))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Implies(Formula):
+	_PREC = 2
+
 	left: Formula
 	right: Formula
-
-	def atoms(self) -> Set[str]:
-		return self.left.atoms() | self.right.atoms()
+	_atoms: FrozenSet[str] = field(init=False, repr=False, compare=False)
+	_eval: Callable[[Dict[str, bool]], bool] = field(init=False, repr=False, compare=False)
+	_hash: int = field(init=False, repr=False, compare=False)
+
+	__eq__ = Formula.__eq__
+	__hash__ = Formula.__hash__
+
+	def __post_init__(self) -> None:
+		object.__setattr__(self, "_hash", hash((Implies, self.left._hash, self.right._hash)))
+		object.__setattr__(self, "_atoms", self.left.atoms() | self.right.atoms())
+		object.__setattr__(
+			self,
+			"_eval",
+			(lambda a, lhs=self.left._eval, rhs=self.right._eval: rhs(a) or not lhs(a))
+			if _cheaper_first(self.left, self.right)[0] is self.right
+			else (lambda a, lhs=self.left._eval, rhs=self.right._eval: (not lhs(a)) or rhs(a)),
+		)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Iff(Formula):
+	_PREC = 1
+
 	left: Formula
 	right: Formula
+	_atoms: FrozenSet[str] = field(init=False, repr=False, compare=False)
+	_eval: Callable[[Dict[str, bool]], bool] = field(init=False, repr=False, compare=False)
+	_hash: int = field(init=False, repr=False, compare=False)
 
-	def atoms(self) -> Set[str]:
-		return self.left.atoms() | self.right.atoms()
+	__eq__ = Formula.__eq__
+	__hash__ = Formula.__hash__
+
+	def __post_init__(self) -> None:
+		object.__setattr__(self, "_hash", hash((Iff, self.left._hash, self.right._hash)))
+		object.__setattr__(self, "_atoms", self.left.atoms() | self.right.atoms())
+		object.__setattr__(self, "_eval", lambda a, lhs=self.left._eval, rhs=self.right._eval: lhs(a) == rhs(a))
 
 
 FormulaLike = Formula
 
+_ATOM_CACHE: "weakref.WeakValueDictionary[str, Atom]" = weakref.WeakValueDictionary()
+
+
+def _make_atom(name: str) -> Atom:
+	atom = _ATOM_CACHE.get(name)
+	if atom is None:
+		name = sys.intern(name)
+		atom = Atom(name)
+		_ATOM_CACHE[name] = atom
+	return atom
+
+
+def compile_formula(formula: FormulaLike) -> Callable[[Dict[str, bool]], bool]:
+	if not isinstance(formula, Formula):
+		raise TypeError(f"Unsupported formula type: {type(formula)!r}")
+	return formula._eval
+
 
 def evaluate(formula: FormulaLike, assignment: Dict[str, bool]) -> bool:
+	return compile_formula(formula)(assignment)
+
+
+_FALSE_TRUE = np.array([False, True])
+
+
+def _compile_to_numpy(
+	formula: FormulaLike,
+	atom_index: Dict[str, int],
+	cols: Sequence[np.ndarray],
+	size: int,
+) -> np.ndarray:
 	if isinstance(formula, Atom):
-		return bool(assignment.get(formula.name, False))
+		idx = atom_index.get(formula.name)
+		if idx is None:
+			return np.zeros(size, dtype=bool)
+		return cols[idx]
 	if isinstance(formula, Not):
-		return not evaluate(formula.operand, assignment)
+		return ~_compile_to_numpy(formula.operand, atom_index, cols, size)
+	left = _compile_to_numpy(formula.left, atom_index, cols, size)
+	right = _compile_to_numpy(formula.right, atom_index, cols, size)
 	if isinstance(formula, And):
-		return evaluate(formula.left, assignment) and evaluate(
-			formula.right, assignment
-		)
+		return left & right
 	if isinstance(formula, Or):
-		return evaluate(formula.left, assignment) or evaluate(
-			formula.right, assignment
-		)
+		return left | right
 	if isinstance(formula, Xor):
-		return evaluate(formula.left, assignment) ^ evaluate(
-			formula.right, assignment
-		)
+		return left ^ right
 	if isinstance(formula, Implies):
-		left_val = evaluate(formula.left, assignment)
-		right_val = evaluate(formula.right, assignment)
-		return (not left_val) or right_val
+		return ~left | right
 	if isinstance(formula, Iff):
-		left_val = evaluate(formula.left, assignment)
-		right_val = evaluate(formula.right, assignment)
-		return left_val == right_val
+		return left == right
 	raise TypeError(f"Unsupported formula type: {type(formula)!r}")
 
 
+OP_ATOM = 0
+OP_NOT = 1
+OP_AND = 2
+OP_OR = 3
+OP_XOR = 4
+OP_IMPLIES = 5
+OP_IFF = 6
+
+_BINARY_OPCODES = {
+	And: OP_AND,
+	Or: OP_OR,
+	Xor: OP_XOR,
+	Implies: OP_IMPLIES,
+	Iff: OP_IFF,
+}
+
+
+def compile_formula_to_bytecode(
+	formula: FormulaLike, atom_index: Dict[str, int]
+) -> Tuple[np.ndarray, np.ndarray]:
+	ops: List[int] = []
+	args: List[int] = []
+
+	def _emit(f: FormulaLike) -> None:
+		if isinstance(f, Atom):
+			ops.append(OP_ATOM)
+			args.append(atom_index.get(f.name, -1))
+			return
+		if isinstance(f, Not):
+			_emit(f.operand)
+			ops.append(OP_NOT)
+			args.append(0)
+			return
+		opcode = _BINARY_OPCODES.get(type(f))
+		if opcode is None:
+			raise TypeError(f"Unsupported formula type: {type(f)!r}")
+		_emit(f.left)
+		_emit(f.right)
+		ops.append(opcode)
+		args.append(0)
+
+	_emit(formula)
+	return np.asarray(ops, dtype=np.int32), np.asarray(args, dtype=np.int32)
+
+
+# Bit j of _ROW_PATTERNS[s] is bit s of j, i.e. an atom column within one 64-row word.
+_ROW_PATTERNS = np.array(
+	[
+		0xAAAAAAAAAAAAAAAA,
+		0xCCCCCCCCCCCCCCCC,
+		0xF0F0F0F0F0F0F0F0,
+		0xFF00FF00FF00FF00,
+		0xFFFF0000FFFF0000,
+		0xFFFFFFFF00000000,
+	],
+	dtype=np.uint64,
+)
+_WORD_ZERO = np.uint64(0)
+_WORD_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def eval_bytecode_all_rows(ops: np.ndarray, args: np.ndarray, n_atoms: int, out: np.ndarray) -> None:
+	# Rows are evaluated 64 at a time: bit j of out[w] is row 64 * w + j.
+	stack = np.empty(len(ops), np.uint64)
+	for w in range(out.shape[0]):
+		sp = 0
+		for k in range(len(ops)):
+			op = ops[k]
+			if op == OP_ATOM:
+				# Unknown atoms (index -1) are False, as in evaluate().
+				idx = args[k]
+				word = _WORD_ZERO
+				if idx >= 0:
+					shift = n_atoms - 1 - idx
+					if shift < 6:
+						word = _ROW_PATTERNS[shift]
+					elif (w >> (shift - 6)) & 1:
+						word = _WORD_ONES
+				stack[sp] = word
+				sp += 1
+			elif op == OP_NOT:
+				stack[sp - 1] = ~stack[sp - 1]
+			else:
+				sp -= 1
+				left = stack[sp - 1]
+				right = stack[sp]
+				if op == OP_AND:
+					stack[sp - 1] = left & right
+				elif op == OP_OR:
+					stack[sp - 1] = left | right
+				elif op == OP_XOR:
+					stack[sp - 1] = left ^ right
+				elif op == OP_IMPLIES:
+					stack[sp - 1] = ~left | right
+				else:
+					stack[sp - 1] = ~(left ^ right)
+		out[w] = stack[0]
+
+
+if njit is not None:
+	eval_bytecode_all_rows = njit(cache=True)(eval_bytecode_all_rows)
+
+
+def _formula_column(
+	formula: FormulaLike,
+	atom_index: Dict[str, int],
+	cols: Sequence[np.ndarray],
+	size: int,
+) -> np.ndarray:
+	if njit is None:
+		column = _compile_to_numpy(formula, atom_index, cols, size)
+		# A bare atom compiles to its atom column; copy it so frame columns never alias.
+		return column.copy() if isinstance(formula, Atom) else column
+	ops, args = compile_formula_to_bytecode(formula, atom_index)
+	words = np.empty((size + 63) // 64, dtype=np.uint64)
+	eval_bytecode_all_rows(ops, args, len(cols), words)
+	bits = np.unpackbits(words.astype("<u8").view(np.uint8), bitorder="little")
+	return bits[:size].view(bool)
+
+
 def generate_truth_table(
 	formulas: Sequence[Tuple[str, FormulaLike]] | None = None,
 	atoms: Optional[Sequence[str]] = None,
@@ -119,20 +393,25 @@ def generate_truth_table(
 	else:
 		atom_list = sorted(inferred_atoms)
 
-	rows: List[Dict[str, Union[bool, str]]] = []
-	for values in product([False, True], repeat=len(atom_list)):
-		assignment = dict(zip(atom_list, values))
-		row: Dict[str, Union[bool, str]] = {a: assignment[a] for a in atom_list}
-		for name, f in formulas:
-			row[name] = evaluate(f, assignment)
-		if filter_formula is not None:
-			fname, ff = filter_formula
-			if not evaluate(ff, assignment):
-				continue
-			row[fname] = True
-		rows.append(row)
+	n = len(atom_list)
+	size = 1 << n
+	# Row r assigns atom i the (n-1-i)-th bit of r, so the first atom varies slowest:
+	# its column is runs of 2^(n-1-i) Falses then Trues, repeated 2^i times.
+	cols = [np.tile(np.repeat(_FALSE_TRUE, 1 << (n - 1 - i)), 1 << i) for i in range(n)]
+	atom_index = {a: i for i, a in enumerate(atom_list)}
 
-	return pd.DataFrame(rows)
+	columns: Dict[str, np.ndarray] = {a: cols[i] for i, a in enumerate(atom_list)}
+	for name, f in formulas:
+		columns[name] = _formula_column(f, atom_index, cols, size)
+	if filter_formula is not None:
+		fname, ff = filter_formula
+		keep = _formula_column(ff, atom_index, cols, size)
+		columns = {k: v[keep] for k, v in columns.items()}
+		size = int(keep.sum())
+		columns[fname] = np.ones(size, dtype=bool)
+
+	# Every column is a freshly built array, so the frame can take them without copying.
+	return pd.DataFrame(columns, index=pd.RangeIndex(size), copy=False)
 
 
 @dataclass
@@ -141,8 +420,16 @@ class Rule:
 	premise: FormulaLike
 	conclusion: FormulaLike
 	description: str
+	_compiled: Optional["_CompiledRule"] = field(default=None, init=False, repr=False, compare=False)
+
+	def __getstate__(self) -> Dict[str, object]:
+		# Compiled matchers are closures; they are rebuilt on demand, not pickled.
+		state = dict(self.__dict__)
+		state["_compiled"] = None
+		return state
 
-	def conclusion_atoms(self) -> Set[str]:
+	def conclusion_atoms(self) -> FrozenSet[str]:
+		# Formulas cache their atoms, so this stays O(1) and follows reassignment.
 		return self.conclusion.atoms()
 
 
@@ -160,6 +447,7 @@ def load_rules_from_json(data: Dict[str, List[Dict[str, str]]], domain: str) ->
 				description=r["text"],
 			)
 		)
+	compile_rules(rules)
 	return rules
 
 
@@ -193,14 +481,24 @@ class ForwardResult:
 	contradictions: List[Tuple[str, str]]
 
 
+_MISSING = object()
+
+
 def _formula_to_atoms(formula: FormulaLike, assignment: Dict[str, bool]) -> Set[str]:
-	atoms = formula.atoms()
+	# Each atom is tried in place on the caller's dict and restored afterwards.
+	evaluator = compile_formula(formula)
 	newly_true: Set[str] = set()
-	for a in atoms:
-		test_assignment = dict(assignment)
-		test_assignment[a] = True
-		if evaluate(formula, test_assignment):
-			newly_true.add(a)
+	for a in formula.atoms():
+		previous = assignment.get(a, _MISSING)
+		assignment[a] = True
+		try:
+			if evaluator(assignment):
+				newly_true.add(a)
+		finally:
+			if previous is _MISSING:
+				del assignment[a]
+			else:
+				assignment[a] = previous
 	return newly_true
 
 
@@ -211,7 +509,226 @@ def detect_contradictions(facts: Set[str]) -> List[Tuple[str, str]]:
 	return [(c, f"Contradiction between {c} and NOT {c}") for c in conflicts]
 
 
-def forward_chain(initial_facts: Set[str], rules: Sequence[Rule]) -> ForwardResult:
+MAX_MASK_ATOMS = 64
+
+
+def _is_disjunction_of_atoms(formula: FormulaLike) -> bool:
+	if isinstance(formula, Atom):
+		return True
+	if isinstance(formula, Or):
+		return _is_disjunction_of_atoms(formula.left) and _is_disjunction_of_atoms(formula.right)
+	return False
+
+
+def compile_premise(formula: FormulaLike, atom_to_bit: Dict[str, int]) -> Callable[[int], bool]:
+	if isinstance(formula, Atom):
+		bit = atom_to_bit.get(formula.name)
+		if bit is None:
+			return lambda m: False
+		return lambda m, b=1 << bit: bool(m & b)
+	if isinstance(formula, Not):
+		operand = compile_premise(formula.operand, atom_to_bit)
+		return lambda m, o=operand: not o(m)
+	# Flat conjunctions and disjunctions of atoms fold into a single mask test.
+	if isinstance(formula, And) and _is_conjunction_of_atoms(formula):
+		if not formula.atoms() <= atom_to_bit.keys():
+			return lambda m: False
+		bits = _atoms_to_mask(formula.atoms(), atom_to_bit)
+		return lambda m, b=bits: m & b == b
+	if isinstance(formula, Or) and _is_disjunction_of_atoms(formula):
+		bits = _atoms_to_mask((a for a in formula.atoms() if a in atom_to_bit), atom_to_bit)
+		return lambda m, b=bits: bool(m & b)
+	if isinstance(formula, (And, Or)):
+		first, second = _cheaper_first(formula.left, formula.right)
+		left = compile_premise(first, atom_to_bit)
+		right = compile_premise(second, atom_to_bit)
+		if isinstance(formula, And):
+			return lambda m, lhs=left, rhs=right: lhs(m) and rhs(m)
+		return lambda m, lhs=left, rhs=right: lhs(m) or rhs(m)
+	left = compile_premise(formula.left, atom_to_bit)
+	right = compile_premise(formula.right, atom_to_bit)
+	if isinstance(formula, Implies):
+		if _cheaper_first(formula.left, formula.right)[0] is formula.right:
+			return lambda m, lhs=left, rhs=right: rhs(m) or not lhs(m)
+		return lambda m, lhs=left, rhs=right: (not lhs(m)) or rhs(m)
+	if isinstance(formula, Xor):
+		return lambda m, lhs=left, rhs=right: lhs(m) != rhs(m)
+	if isinstance(formula, Iff):
+		return lambda m, lhs=left, rhs=right: lhs(m) == rhs(m)
+	raise TypeError(f"Unsupported formula type: {type(formula)!r}")
+
+
+def _atoms_to_mask(atoms: Iterable[str], atom_to_bit: Dict[str, int]) -> int:
+	mask = 0
+	for a in atoms:
+		mask |= 1 << atom_to_bit[a]
+	return mask
+
+
+def _mask_to_atoms(mask: int, bit_to_atom: Sequence[str]) -> Set[str]:
+	atoms: Set[str] = set()
+	while mask:
+		low = mask & -mask
+		mask ^= low
+		atoms.add(bit_to_atom[low.bit_length() - 1])
+	return atoms
+
+
+def _is_conjunction_of_atoms(formula: FormulaLike) -> bool:
+	if isinstance(formula, Atom):
+		return True
+	if isinstance(formula, And):
+		return _is_conjunction_of_atoms(formula.left) and _is_conjunction_of_atoms(formula.right)
+	return False
+
+
+def _compile_conclusion(formula: FormulaLike, atom_to_bit: Dict[str, int]) -> Callable[[int, int], int]:
+	# The returned adder maps (facts mask, premise-restricted mask) to the bits of
+	# atoms that become newly true, mirroring _formula_to_atoms on the set path.
+	bits = _atoms_to_mask(formula.atoms(), atom_to_bit)
+	if _is_conjunction_of_atoms(formula):
+		# Setting one atom satisfies the conjunction only if all others already hold.
+		def _conjunction(mask: int, base: int) -> int:
+			missing = bits & ~base
+			if not missing:
+				return bits & ~mask
+			if missing & (missing - 1):
+				return 0
+			return missing & ~mask
+
+		return _conjunction
+
+	conclusion = compile_premise(formula, atom_to_bit)
+
+	def _general(mask: int, base: int) -> int:
+		newly_true = 0
+		candidates = bits & ~mask
+		while candidates:
+			low = candidates & -candidates
+			candidates ^= low
+			if conclusion(base | low):
+				newly_true |= low
+		return newly_true
+
+	return _general
+
+
+@dataclass(frozen=True, eq=False)
+class _CompiledRule:
+	atom_to_bit: Dict[str, int]
+	premise: Callable[[int], bool]
+	premise_bits: int
+	conclusion: Callable[[int, int], int]
+	negations: Dict[int, int]
+	negated_bits: int
+	# The formulas compiled above; a rule whose premise or conclusion has since
+	# been reassigned no longer matches them and is compiled afresh.
+	source_premise: FormulaLike
+	source_conclusion: FormulaLike
+
+
+def _add_negations(negations: Dict[int, int], atom_to_bit: Dict[str, int], atoms: Iterable[str]) -> Dict[int, int]:
+	# Maps the bit of each "NOT X" atom to the bit of X, for pairs involving
+	# ``atoms``; as in detect_contradictions, X itself must not be negated.
+	for atom in atoms:
+		if atom.startswith("NOT "):
+			positive = atom[4:]
+			if not positive.startswith("NOT ") and positive in atom_to_bit:
+				negations[1 << atom_to_bit[atom]] = 1 << atom_to_bit[positive]
+		else:
+			negative = atom_to_bit.get("NOT " + atom)
+			if negative is not None:
+				negations[1 << negative] = 1 << atom_to_bit[atom]
+	return negations
+
+
+def _union_bits(bits: Iterable[int]) -> int:
+	mask = 0
+	for bit in bits:
+		mask |= bit
+	return mask
+
+
+def _compile_rule(
+	rule: Rule, atom_to_bit: Dict[str, int], negations: Dict[int, int], negated_bits: int
+) -> _CompiledRule:
+	return _CompiledRule(
+		atom_to_bit=atom_to_bit,
+		premise=compile_premise(rule.premise, atom_to_bit),
+		premise_bits=_atoms_to_mask(rule.premise.atoms(), atom_to_bit),
+		conclusion=_compile_conclusion(rule.conclusion, atom_to_bit),
+		negations=negations,
+		negated_bits=negated_bits,
+		source_premise=rule.premise,
+		source_conclusion=rule.conclusion,
+	)
+
+
+def compile_rules(rules: Sequence[Rule]) -> None:
+	universe: Set[str] = set()
+	for rule in rules:
+		universe |= rule.premise.atoms() | rule.conclusion.atoms()
+	if len(universe) > MAX_MASK_ATOMS:
+		return
+	atom_to_bit = {a: i for i, a in enumerate(sorted(universe))}
+	negations = _add_negations({}, atom_to_bit, atom_to_bit)
+	negated_bits = _union_bits(negations)
+	for rule in rules:
+		rule._compiled = _compile_rule(rule, atom_to_bit, negations, negated_bits)
+
+
+def _precompiled_rules(rules: Sequence[Rule]) -> Optional[List[_CompiledRule]]:
+	# Usable only if every rule was compiled, from its current formulas, against
+	# the same bit assignment.
+	if not rules or rules[0]._compiled is None:
+		return None
+	atom_to_bit = rules[0]._compiled.atom_to_bit
+	compiled: List[_CompiledRule] = []
+	for rule in rules:
+		c = rule._compiled
+		if (
+			c is None
+			or c.atom_to_bit is not atom_to_bit
+			or c.source_premise is not rule.premise
+			or c.source_conclusion is not rule.conclusion
+		):
+			return None
+		compiled.append(c)
+	return compiled
+
+
+def _mask_contradictions(
+	mask: int, bit_to_atom: Sequence[str], negations: Dict[int, int], negated_bits: int
+) -> List[Tuple[str, str]]:
+	# Mirrors detect_contradictions: "NOT X" facts are tracked as their own bits,
+	# so fold the ones that hold onto X's bit and AND with the facts.
+	present = mask & negated_bits
+	negated = 0
+	while present:
+		low = present & -present
+		present ^= low
+		negated |= negations[low]
+	conflict = mask & negated
+	contradictions: List[Tuple[str, str]] = []
+	while conflict:
+		low = conflict & -conflict
+		conflict ^= low
+		c = bit_to_atom[low.bit_length() - 1]
+		contradictions.append((c, f"Contradiction between {c} and NOT {c}"))
+	contradictions.sort()
+	return contradictions
+
+
+def _forward_step(step: int, rule: Rule, new_atoms: Set[str]) -> ForwardStep:
+	explanation_atoms = " and ".join(sorted(rule.premise.atoms()))
+	explanation = (
+		f"Step {step}: {rule.id} fired because "
+		f"{explanation_atoms} are True -> inferred {', '.join(sorted(new_atoms))}."
+	)
+	return ForwardStep(step=step, rule_id=rule.id, inferred=new_atoms, explanation=explanation)
+
+
+def _forward_chain_sets(initial_facts: Set[str], rules: Sequence[Rule]) -> ForwardResult:
 	facts: Set[str] = set(initial_facts)
 	steps: List[ForwardStep] = []
 	step_counter = 1
@@ -227,19 +744,7 @@ def forward_chain(initial_facts: Set[str], rules: Sequence[Rule]) -> ForwardResu
 					continue
 				fired_any = True
 				facts |= new_atoms
-				explanation_atoms = " and ".join(sorted(rule.premise.atoms()))
-				explanation = (
-					f"Step {step_counter}: {rule.id} fired because "
-					f"{explanation_atoms} are True -> inferred {', '.join(sorted(new_atoms))}."
-				)
-				steps.append(
-					ForwardStep(
-						step=step_counter,
-						rule_id=rule.id,
-						inferred=new_atoms,
-						explanation=explanation,
-					)
-				)
+				steps.append(_forward_step(step_counter, rule, new_atoms))
 				step_counter += 1
 		if not fired_any:
 			break
@@ -247,6 +752,89 @@ def forward_chain(initial_facts: Set[str], rules: Sequence[Rule]) -> ForwardResu
 	contradictions = detect_contradictions(facts)
 	return ForwardResult(final_facts=facts, steps=steps, contradictions=contradictions)
 
+
+def forward_chain(initial_facts: Set[str], rules: Sequence[Rule]) -> ForwardResult:
+	compiled = _precompiled_rules(rules)
+	if compiled is not None:
+		atom_to_bit = compiled[0].atom_to_bit
+		negations = compiled[0].negations
+		negated_bits = compiled[0].negated_bits
+		extra = sorted(set(initial_facts) - atom_to_bit.keys())
+		if extra:
+			atom_to_bit = dict(atom_to_bit)
+			for a in extra:
+				atom_to_bit[a] = len(atom_to_bit)
+			if len(atom_to_bit) <= MAX_MASK_ATOMS:
+				negations = _add_negations(dict(negations), atom_to_bit, extra)
+				negated_bits = _union_bits(negations)
+	else:
+		universe: Set[str] = set(initial_facts)
+		for rule in rules:
+			universe |= rule.premise.atoms() | rule.conclusion.atoms()
+		atom_to_bit = {a: i for i, a in enumerate(sorted(universe))}
+	if len(atom_to_bit) > MAX_MASK_ATOMS:
+		return _forward_chain_sets(initial_facts, rules)
+	if compiled is None:
+		negations = _add_negations({}, atom_to_bit, atom_to_bit)
+		negated_bits = _union_bits(negations)
+		compiled = [_compile_rule(rule, atom_to_bit, negations, negated_bits) for rule in rules]
+	bit_to_atom = sorted(atom_to_bit, key=atom_to_bit.__getitem__)
+
+	dependents: Dict[int, List[int]] = {}
+	for i, c in enumerate(compiled):
+		bits = c.premise_bits
+		while bits:
+			low = bits & -bits
+			bits ^= low
+			dependents.setdefault(low, []).append(i)
+
+	facts: Set[str] = set(initial_facts)
+	mask = _atoms_to_mask(facts, atom_to_bit)
+	steps: List[ForwardStep] = []
+	step_counter = 1
+
+	# Rules are visited in passes, in rule order, as in the set-based path. A rule
+	# whose premise atoms have not changed since it was last tested cannot fire,
+	# so only rules depending on newly inferred atoms are queued again: later in
+	# the current pass if they come after the firing rule, otherwise next pass.
+	pending = list(range(len(compiled)))
+	queued = [True] * len(compiled)
+	while pending:
+		next_pass: List[int] = []
+		while pending:
+			i = heapq.heappop(pending)
+			queued[i] = False
+			c = compiled[i]
+			if not c.premise(mask):
+				continue
+			# The conclusion only sees the premise atoms, as in the set-based path.
+			new_bits = c.conclusion(mask, mask & c.premise_bits)
+			if not new_bits:
+				continue
+			mask |= new_bits
+			new_atoms = _mask_to_atoms(new_bits, bit_to_atom)
+			facts |= new_atoms
+			steps.append(_forward_step(step_counter, rules[i], new_atoms))
+			step_counter += 1
+
+			changed = new_bits
+			while changed:
+				low = changed & -changed
+				changed ^= low
+				for j in dependents.get(low, ()):
+					if queued[j]:
+						continue
+					queued[j] = True
+					if j > i:
+						heapq.heappush(pending, j)
+					else:
+						next_pass.append(j)
+		next_pass.sort()
+		pending = next_pass
+
+	contradictions = _mask_contradictions(mask, bit_to_atom, negations, negated_bits)
+	return ForwardResult(final_facts=facts, steps=steps, contradictions=contradictions)
+
 @dataclass
 class ProofNode:
 	goal: str
@@ -265,8 +853,26 @@ def backward_chain(
 
 	if visited is None:
 		visited = set()
+	conclusion_index: Dict[str, List[Rule]] = {}
+	for r in rules:
+		for a in r.conclusion_atoms():
+			conclusion_index.setdefault(a, []).append(r)
+	return _backward_chain(goal, facts, conclusion_index, visited, {})
+
+
+def _backward_chain(
+	goal: str,
+	facts: Set[str],
+	conclusion_index: Dict[str, List[Rule]],
+	visited: Set[str],
+	memo: Dict[str, ProofNode],
+) -> ProofNode:
 	if goal in facts:
 		return ProofNode(goal=goal, rule_id=None, premises=[], succeeded=True, message="Given as a fact.")
+	# Facts and rules are fixed for one top-level call, so a goal's proof can be shared.
+	cached = memo.get(goal)
+	if cached is not None:
+		return cached
 	if goal in visited:
 		return ProofNode(
 			goal=goal,
@@ -276,8 +882,19 @@ def backward_chain(
 			message="Cycle detected while proving this goal.",
 		)
 	visited.add(goal)
+	node = _prove_goal(goal, facts, conclusion_index, visited, memo)
+	memo[goal] = node
+	return node
+
 
-	applicable_rules = [r for r in rules if goal in r.conclusion_atoms()]
+def _prove_goal(
+	goal: str,
+	facts: Set[str],
+	conclusion_index: Dict[str, List[Rule]],
+	visited: Set[str],
+	memo: Dict[str, ProofNode],
+) -> ProofNode:
+	applicable_rules = conclusion_index.get(goal, [])
 	if not applicable_rules:
 		return ProofNode(
 			goal=goal,
@@ -291,7 +908,7 @@ def backward_chain(
 		sub_nodes: List[ProofNode] = []
 		all_ok = True
 		for atom in sorted(rule.premise.atoms()):
-			node = backward_chain(atom, facts, rules, visited)
+			node = _backward_chain(atom, facts, conclusion_index, visited, memo)
 			sub_nodes.append(node)
 			if not node.succeeded:
 				all_ok = False
@@ -322,11 +939,17 @@ __all__ = [
 	"Xor",
 	"Implies",
 	"Iff",
+	"compile_formula",
 	"evaluate",
+	"compile_formula_to_bytecode",
+	"eval_bytecode_all_rows",
 	"generate_truth_table",
 	"Rule",
 	"ForwardResult",
 	"ForwardStep",
+	"MAX_MASK_ATOMS",
+	"compile_premise",
+	"compile_rules",
 	"forward_chain",
 	"ProofNode",
 	"backward_chain",
@@ -1,17 +1,25 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Optional
+import re
+from functools import lru_cache
+from itertools import product
+from typing import Callable, List, NamedTuple, Optional, Tuple
 
-from logic_core import And, Atom, Iff, Implies, Not, Or, Xor, Formula
+import numpy as np
+
+try:
+	from numba import njit
+except ImportError:  # pragma: no cover - numba is optional
+	njit = None
+
+from logic_core import And, Atom, Iff, Implies, Not, Or, Xor, Formula, _make_atom
 
 
 class ParseError(ValueError):
 	"""Raised when the input formula has invalid syntax."""
 
 
-@dataclass
-class Token:
+class Token(NamedTuple):
 	kind: str
 	value: str
 
@@ -23,63 +31,172 @@ KEYWORDS = {
 	"XOR": "XOR",
 }
 
+# Every upper/lower-case spelling of each keyword mapped to its kind, so an
+# identifier is classified with one dict lookup instead of allocating a new
+# string through .upper() for every identifier.
+_KEYWORD_KINDS = {
+	"".join(chars): kind
+	for word, kind in KEYWORDS.items()
+	for chars in product(*((c, c.lower()) for c in word))
+}
+
 
-def _is_ident_char(ch: str) -> bool:
-	return ch.isalnum() or ch in {"_"}
+# Shared end-of-input sentinel. It keeps the parser's one-token lookahead in
+# bounds, so kinds[pos] never needs a length check.
+_EOF_TOKEN = Token("EOF", "")
+
+# Identifiers come first as the most frequent tokens; whitespace matches with
+# no group, so m.lastindex is None for it.
+_TOKEN_RE = re.compile(r"(\w+)|\s+|([()&|~])|(<->)|(->)")
+_IDENT_GROUP = 1
+_SINGLE_CHAR_GROUP = 2
+_GROUP_KINDS = (None, "IDENT", None, "IFF", "IMPLIES")
+
+_SINGLE_CHAR_KIND = {
+	"(": "(",
+	")": ")",
+	"&": "AND",
+	"|": "OR",
+	"~": "NOT",
+}
 
 
-def tokenize(text: str) -> List[Token]:
+@lru_cache(maxsize=1024)
+def tokenize(text: str) -> Tuple[Token, ...]:
+	# Long ASCII formulas go through the JIT-compiled byte scanner when numba is
+	# available; below the threshold its call overhead outweighs the regex.
+	if njit is not None and len(text) >= _NUMBA_MIN_LENGTH and text.isascii():
+		return _tokenize_scanned(text)
+	# Grown by append: a list pre-sized to len(text) + 1 measured no faster and
+	# needs an extra slice before the tuple copy.
 	tokens: List[Token] = []
+	end = 0
+	for m in _TOKEN_RE.finditer(text):
+		if m.start() != end:
+			raise ParseError(f"Unexpected character '{text[end]}' at position {end}.")
+		end = m.end()
+		group = m.lastindex
+		if group is None:
+			continue
+		value = m.group()
+		if group == _IDENT_GROUP:
+			tokens.append(Token(_KEYWORD_KINDS.get(value, "IDENT"), value))
+		elif group == _SINGLE_CHAR_GROUP:
+			tokens.append(Token(_SINGLE_CHAR_KIND[value], value))
+		else:
+			tokens.append(Token(_GROUP_KINDS[group], value))
+	if end != len(text):
+		raise ParseError(f"Unexpected character '{text[end]}' at position {end}.")
+	tokens.append(_EOF_TOKEN)
+	return tuple(tokens)
+
+
+_SCAN_KINDS = ("IDENT", "(", ")", "AND", "OR", "NOT", "IFF", "IMPLIES")
+_NUMBA_MIN_LENGTH = 256
+
+
+def _scan_tokens(buf: np.ndarray, kinds: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> int:
+	# Byte-level scanner for ASCII text. Writes kind indices into _SCAN_KINDS
+	# and [start, end) offsets, and returns the token count, or -1 - position
+	# of the first character that starts no token.
+	n = buf.shape[0]
 	i = 0
-	while i < len(text):
-		ch = text[i]
-		if ch.isspace():
+	count = 0
+	while i < n:
+		c = buf[i]
+		if c == 32 or 9 <= c <= 13 or 28 <= c <= 31:
 			i += 1
 			continue
-		if ch in "()":
-			tokens.append(Token(ch, ch))
+		start = i
+		if 97 <= (c | 0x20) <= 122 or 48 <= c <= 57 or c == 95:
 			i += 1
-			continue
-		if text.startswith("<->", i):
-			tokens.append(Token("IFF", "<->"))
-			i += 3
-			continue
-		if text.startswith("->", i):
-			tokens.append(Token("IMPLIES", "->"))
-			i += 2
-			continue
-		if ch == "&":
-			tokens.append(Token("AND", "&"))
+			while i < n:
+				c = buf[i]
+				if 97 <= (c | 0x20) <= 122 or 48 <= c <= 57 or c == 95:
+					i += 1
+				else:
+					break
+			kind = 0
+		elif c == 40:
+			kind = 1
 			i += 1
-			continue
-		if ch == "|":
-			tokens.append(Token("OR", "|"))
+		elif c == 41:
+			kind = 2
 			i += 1
-			continue
-		if ch == "~":
-			tokens.append(Token("NOT", "~"))
+		elif c == 38:
+			kind = 3
 			i += 1
-			continue
-		# Identifier or keyword
-		if _is_ident_char(ch):
-			start = i
-			while i < len(text) and _is_ident_char(text[i]):
-				i += 1
-			ident = text[start:i]
-			upper = ident.upper()
-			if upper in KEYWORDS:
-				tokens.append(Token(KEYWORDS[upper], ident))
-			else:
-				tokens.append(Token("IDENT", ident))
-			continue
-		raise ParseError(f"Unexpected character '{ch}' at position {i}.")
-	tokens.append(Token("EOF", ""))
-	return tokens
+		elif c == 124:
+			kind = 4
+			i += 1
+		elif c == 126:
+			kind = 5
+			i += 1
+		elif c == 60 and i + 2 < n and buf[i + 1] == 45 and buf[i + 2] == 62:
+			kind = 6
+			i += 3
+		elif c == 45 and i + 1 < n and buf[i + 1] == 62:
+			kind = 7
+			i += 2
+		else:
+			return -1 - i
+		kinds[count] = kind
+		starts[count] = start
+		ends[count] = i
+		count += 1
+	return count
+
+
+if njit is not None:
+	_scan_tokens = njit(cache=True)(_scan_tokens)
+
+
+def _tokenize_scanned(text: str) -> Tuple[Token, ...]:
+	buf = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+	size = len(text)
+	kinds = np.empty(size, dtype=np.int32)
+	starts = np.empty(size, dtype=np.int32)
+	ends = np.empty(size, dtype=np.int32)
+	count = _scan_tokens(buf, kinds, starts, ends)
+	if count < 0:
+		pos = -1 - count
+		raise ParseError(f"Unexpected character '{text[pos]}' at position {pos}.")
+	tokens: List[Token] = []
+	for kind, start, end in zip(kinds[:count].tolist(), starts[:count].tolist(), ends[:count].tolist()):
+		value = text[start:end]
+		if kind == 0:
+			tokens.append(Token(_KEYWORD_KINDS.get(value, "IDENT"), value))
+		else:
+			tokens.append(Token(_SCAN_KINDS[kind], value))
+	tokens.append(_EOF_TOKEN)
+	return tuple(tokens)
+
+
+# Binary connectives by token kind: (precedence, node class). All are
+# left-associative; a higher precedence binds tighter.
+_BINOPS = {
+	"IFF": (1, Iff),
+	"IMPLIES": (2, Implies),
+	"OR": (3, Or),
+	"XOR": (4, Xor),
+	"AND": (5, And),
+}
 
 
+# The grammar is LL(1): one token of lookahead and no backtracking, so each
+# token position is parsed exactly once and a packrat memo would never hit.
 class Parser:
-	def __init__(self, text: str):
-		self.tokens = tokenize(text)
+	tokens: Tuple[Token, ...]
+	kinds: List[str]
+	values: List[str]
+	pos: int
+
+	def __init__(self, text: str) -> None:
+		# parse_formula already caches whole trees, so parsing skips the token
+		# cache rather than storing a second copy of the same input.
+		self.tokens = tokenize.__wrapped__(text)
+		self.kinds = [tok[0] for tok in self.tokens]
+		self.values = [tok[1] for tok in self.tokens]
 		self.pos = 0
 
 	@property
@@ -87,124 +204,151 @@ class Parser:
 		return self.tokens[self.pos]
 
 	def accept(self, kind: str) -> Optional[Token]:
-		if self.current.kind == kind:
-			tok = self.current
+		if self.kinds[self.pos] == kind:
 			self.pos += 1
-			return tok
+			return self.tokens[self.pos - 1]
 		return None
 
 	def expect(self, kind: str) -> Token:
 		tok = self.accept(kind)
 		if tok is None:
 			raise ParseError(
-				f"Expected {kind} but found {self.current.kind} at position {self.pos}."
+				f"Expected {kind} but found {self.kinds[self.pos]} at position {self.pos}."
 			)
 		return tok
 	
 	def parse(self) -> Formula:
-		node = self.parse_iff()
-		if self.current.kind != "EOF":
+		node = self.parse_binary(1)
+		if self.kinds[self.pos] != "EOF":
 			raise ParseError(
-				f"Unexpected token '{self.current.value}' after end of formula."
+				f"Unexpected token '{self.values[self.pos]}' after end of formula."
 			)
 		return node
 
-	def parse_iff(self) -> Formula:
-		node = self.parse_implies()
-		while self.accept("IFF") is not None:
-			right = self.parse_implies()
-			node = Iff(left=node, right=right)
-		return node
-
-	def parse_implies(self) -> Formula:
-		node = self.parse_or()
-		while self.accept("IMPLIES") is not None:
-			right = self.parse_or()
-			node = Implies(left=node, right=right)
-		return node
-
-	def parse_or(self) -> Formula:
-		node = self.parse_xor()
-		while self.accept("OR") is not None:
-			right = self.parse_xor()
-			node = Or(left=node, right=right)
-		return node
-
-	def parse_xor(self) -> Formula:
-		node = self.parse_and()
-		while self.accept("XOR") is not None:
-			right = self.parse_and()
-			node = Xor(left=node, right=right)
-		return node
-
-	def parse_and(self) -> Formula:
+	def parse_binary(self, min_prec: int) -> Formula:
+		kinds = self.kinds
 		node = self.parse_unary()
-		while self.accept("AND") is not None:
-			right = self.parse_unary()
-			node = And(left=node, right=right)
-		return node
+		while True:
+			info = _BINOPS.get(kinds[self.pos])
+			if info is None or info[0] < min_prec:
+				return node
+			prec, cls = info
+			self.pos += 1
+			right = self.parse_binary(prec + 1)
+			node = cls(node, right)
 
 	def parse_unary(self) -> Formula:
-		if self.accept("NOT") is not None:
-			operand = self.parse_unary()
-			return Not(operand=operand)
-		return self.parse_primary()
+		kinds = self.kinds
+		pos = self.pos
+		negations = 0
+		while kinds[pos] == "NOT":
+			pos += 1
+			negations += 1
+		self.pos = pos
+		node = self.parse_primary()
+		for _ in range(negations):
+			node = Not(node)
+		return node
 
 	def parse_primary(self) -> Formula:
-		if self.accept("(") is not None:
-			node = self.parse_iff()
-			self.expect(")")
-			return node
-		if self.current.kind == "IDENT":
-			name = self.current.value
+		pos = self.pos
+		kind = self.kinds[pos]
+		if kind == "(":
+			self.pos = pos + 1
+			node = self.parse_binary(1)
+			if self.kinds[self.pos] != ")":
+				raise ParseError(
+					f"Expected ) but found {self.kinds[self.pos]} at position {self.pos}."
+				)
 			self.pos += 1
-			return Atom(name=name)
+			return node
+		if kind == "IDENT":
+			self.pos = pos + 1
+			return _make_atom(self.values[pos])
 		raise ParseError(
-			f"Unexpected token '{self.current.value}' where an atom or '(' was expected."
+			f"Unexpected token '{self.values[pos]}' where an atom or '(' was expected."
 		)
 
 
+@lru_cache(maxsize=4096)
 def parse_formula(text: str) -> Formula:
+	"""Parse ``text`` into a shared, frozen tree.
+
+	Up to 4096 results are cached until evicted or :func:`clear_parser_cache`,
+	so equal strings return the same object while cached.
+	"""
+	stripped = text.strip()
+	# Bare identifiers, by far the most common conclusions, skip the tokenizer.
+	if stripped.isascii() and stripped.isidentifier() and stripped not in _KEYWORD_KINDS:
+		return _make_atom(stripped)
 	parser = Parser(text)
 	return parser.parse()
 
 
+def clear_parser_cache() -> None:
+	"""Drop cached tokens, parsed trees and their formatted strings."""
+	parse_formula.cache_clear()
+	tokenize.cache_clear()
+	formula_to_str.cache_clear()
+
+
+def _push_wrapped(stack: List[object], child: Formula, parent_prec: int) -> None:
+	if child._PREC < parent_prec:
+		stack.extend((")", child, "("))
+	else:
+		stack.append(child)
+
+
+def _emit_atom(node: Atom, stack: List[object]) -> None:
+	stack.append(node.name)
+
+
+def _emit_not(node: Not, stack: List[object]) -> None:
+	_push_wrapped(stack, node.operand, node._PREC)
+	stack.append("NOT ")
+
+
+def _binary_emitter(symbol: str) -> Callable[[Formula, List[object]], None]:
+	separator = f" {symbol} "
+
+	def emit(node: Formula, stack: List[object]) -> None:
+		# Pushed in reverse so the fragments pop off left to right.
+		prec = node._PREC
+		_push_wrapped(stack, node.right, prec)
+		stack.append(separator)
+		_push_wrapped(stack, node.left, prec)
+
+	return emit
+
+
+_FMT_TABLE = {
+	Atom: _emit_atom,
+	Not: _emit_not,
+	And: _binary_emitter("AND"),
+	Xor: _binary_emitter("XOR"),
+	Or: _binary_emitter("OR"),
+	Implies: _binary_emitter("->"),
+	Iff: _binary_emitter("<->"),
+}
+
+
+@lru_cache(maxsize=4096)
 def formula_to_str(node: Formula) -> str:
-	PRECEDENCE = {
-		Atom: 7,
-		Not: 6,
-		And: 5,
-		Xor: 4,
-		Or: 3,
-		Implies: 2,
-		Iff: 1,
-	}
-
-	def _wrap(child: Formula, parent_prec: int) -> str:
-		text = _fmt(child)
-		child_prec = PRECEDENCE[type(child)]
-		if child_prec < parent_prec:
-			return f"({text})"
-		return text
-
-	def _fmt(n: Formula) -> str:
-		if isinstance(n, Atom):
-			return n.name
-		if isinstance(n, Not):
-			return f"NOT {_wrap(n.operand, PRECEDENCE[Not])}"
-		if isinstance(n, And):
-			return f"{_wrap(n.left, PRECEDENCE[And])} AND {_wrap(n.right, PRECEDENCE[And])}"
-		if isinstance(n, Xor):
-			return f"{_wrap(n.left, PRECEDENCE[Xor])} XOR {_wrap(n.right, PRECEDENCE[Xor])}"
-		if isinstance(n, Or):
-			return f"{_wrap(n.left, PRECEDENCE[Or])} OR {_wrap(n.right, PRECEDENCE[Or])}"
-		if isinstance(n, Implies):
-			return f"{_wrap(n.left, PRECEDENCE[Implies])} -> {_wrap(n.right, PRECEDENCE[Implies])}"
-		if isinstance(n, Iff):
-			return f"{_wrap(n.left, PRECEDENCE[Iff])} <-> {_wrap(n.right, PRECEDENCE[Iff])}"
-		raise TypeError(f"Unsupported formula node: {type(n)!r}")
-
-	return _fmt(node)
+	# Explicit stack of pending nodes and literal fragments: a node expands into
+	# its operator text, parentheses and children, and the fragments popped in
+	# order are joined once at the end.
+	fragments: List[str] = []
+	stack: List[object] = [node]
+	while stack:
+		item = stack.pop()
+		if type(item) is str:
+			fragments.append(item)
+			continue
+		emit = _FMT_TABLE.get(type(item))
+		if emit is None:
+			raise TypeError(f"Unsupported formula node: {type(item)!r}")
+		emit(item, stack)
+	return "".join(fragments)
 
 
 __all__ = [
@@ -213,5 +357,6 @@ __all__ = [
 	"tokenize",
 	"Parser",
 	"parse_formula",
+	"clear_parser_cache",
 	"formula_to_str",
 ]
\ No newline at end of file
@@ -5,6 +5,7 @@ from typing import Dict
 import os
 import sys
 
+import numpy as np
 import pandas as pd
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
@@ -14,18 +15,26 @@ if PROJECT_ROOT not in sys.path:
 from logic_core import (
 	And,
 	Atom,
+	Formula,
 	Iff,
 	Implies,
 	Not,
 	Or,
 	Xor,
+	MAX_MASK_ATOMS,
+	_forward_chain_sets,
 	backward_chain,
+	compile_formula_to_bytecode,
+	compile_rules,
+	detect_contradictions,
+	eval_bytecode_all_rows,
 	forward_chain,
 	generate_truth_table,
+	load_rules_from_json,
 	Rule,
 	evaluate,
 )
-from parser import ParseError, parse_formula
+from parser import ParseError, clear_parser_cache, formula_to_str, parse_formula, tokenize
 
 
 def test_parser_basic_operators() -> None:
@@ -89,3 +98,214 @@ def test_parser_invalid_input_raises() -> None:
 	except ParseError:
 		raised = True
 	assert raised is True
+
+
+def test_truth_table_matches_evaluate() -> None:
+	f = parse_formula("(A XOR B) <-> (NOT C -> A OR B)")
+	df = generate_truth_table([("F", f)], atoms=["A", "B", "C", "D"])
+	assert len(df) == 16
+	for _, row in df.iterrows():
+		assignment = {a: bool(row[a]) for a in ["A", "B", "C", "D"]}
+		assert bool(row["F"]) == evaluate(f, assignment)
+	assert list(df.iloc[1][["A", "B", "C", "D"]]) == [False, False, False, True]
+
+
+def test_truth_table_filter_formula() -> None:
+	f = parse_formula("A OR B")
+	df = generate_truth_table([("F", f)], filter_formula=("Only", parse_formula("A AND NOT B")))
+	assert len(df) == 1
+	assert list(df.columns) == ["A", "B", "F", "Only"]
+	assert bool(df.iloc[0]["A"]) and not bool(df.iloc[0]["B"])
+
+
+def test_forward_chain_bitmask_matches_set_path() -> None:
+	rules = [
+		Rule("R1", parse_formula("A AND B"), parse_formula("C"), ""),
+		Rule("R2", parse_formula("C OR D"), parse_formula("E"), ""),
+		Rule("R3", parse_formula("E AND NOT F"), parse_formula("G"), ""),
+		Rule("R4", parse_formula("G -> H"), parse_formula("H"), ""),
+	]
+	result = forward_chain({"A", "B"}, rules)
+	reference = _forward_chain_sets({"A", "B"}, rules)
+	assert result.final_facts == reference.final_facts == {"A", "B", "C", "E", "G"}
+	assert [s.rule_id for s in result.steps] == [s.rule_id for s in reference.steps]
+	assert [s.explanation for s in result.steps] == [s.explanation for s in reference.steps]
+
+
+def test_forward_chain_falls_back_above_mask_width() -> None:
+	chain = [
+		Rule(f"R{i}", Atom(f"X{i}"), Atom(f"X{i + 1}"), "")
+		for i in range(MAX_MASK_ATOMS + 1)
+	]
+	result = forward_chain({"X0"}, chain)
+	assert f"X{MAX_MASK_ATOMS + 1}" in result.final_facts
+	assert len(result.steps) == MAX_MASK_ATOMS + 1
+
+
+def test_backward_chain_reuses_shared_subgoal() -> None:
+	rules = [
+		Rule("R1", parse_formula("A AND B"), parse_formula("G"), ""),
+		Rule("R2", parse_formula("Y"), parse_formula("A"), ""),
+		Rule("R3", parse_formula("Y"), parse_formula("B"), ""),
+		Rule("R4", parse_formula("X"), parse_formula("Y"), ""),
+	]
+	proof = backward_chain("G", {"X"}, rules)
+	assert proof.succeeded is True
+	a_node, b_node = proof.premises
+	assert a_node.premises[0] is b_node.premises[0]
+
+
+def test_bytecode_kernel_matches_numpy_columns() -> None:
+	f = parse_formula("(A -> B) XOR NOT (C <-> Missing) OR A AND C")
+	atom_index = {"A": 0, "B": 1, "C": 2}
+	ops, args = compile_formula_to_bytecode(f, atom_index)
+	expected = generate_truth_table([("F", f)], atoms=["A", "B", "C"])["F"].to_numpy()
+	kernel = getattr(eval_bytecode_all_rows, "py_func", eval_bytecode_all_rows)
+	for run in {kernel, eval_bytecode_all_rows}:
+		out = np.empty(1, dtype=np.uint64)
+		run(ops, args, 3, out)
+		rows = [bool((int(out[0]) >> r) & 1) for r in range(8)]
+		assert rows == expected.tolist()
+		assert rows == [
+			evaluate(f, {"A": bool(r & 4), "B": bool(r & 2), "C": bool(r & 1)}) for r in range(8)
+		]
+
+
+def test_formula_pickle_round_trip_rebuilds_closure() -> None:
+	import pickle
+
+	f = parse_formula("A AND NOT (B -> C)")
+	g = pickle.loads(pickle.dumps(f))
+	assert g == f
+	assert g.atoms() == {"A", "B", "C"}
+	assert evaluate(g, {"A": True, "B": True}) is True
+
+
+def test_forward_chain_conclusion_shapes_match_set_path() -> None:
+	rules = [
+		Rule("R1", parse_formula("A AND D"), parse_formula("D AND E"), ""),
+		Rule("R2", parse_formula("A"), parse_formula("F AND G"), ""),
+		Rule("R3", parse_formula("A OR B"), parse_formula("H OR NOT I"), ""),
+		Rule("R4", parse_formula("E"), parse_formula("(E AND J) AND K"), ""),
+	]
+	for initial in ({"A"}, {"A", "D"}, {"B", "E", "J"}):
+		result = forward_chain(set(initial), rules)
+		reference = _forward_chain_sets(set(initial), rules)
+		assert result.final_facts == reference.final_facts
+		assert [(s.rule_id, s.inferred) for s in result.steps] == [
+			(s.rule_id, s.inferred) for s in reference.steps
+		]
+
+
+def test_forward_chain_reports_contradictions() -> None:
+	rule = Rule("R1", parse_formula("A"), parse_formula("B"), "")
+	result = forward_chain({"A", "NOT B", "NOT A", "NOT C"}, [rule])
+	assert result.contradictions == [
+		("A", "Contradiction between A and NOT A"),
+		("B", "Contradiction between B and NOT B"),
+	]
+
+
+def test_precompiled_rules_detect_negated_atoms_in_rules() -> None:
+	rules = [
+		Rule("R1", Atom("A"), Atom("NOT B"), ""),
+		Rule("R2", Atom("NOT B"), Atom("NOT NOT A"), ""),
+	]
+	compile_rules(rules)
+	result = forward_chain({"A", "B"}, rules)
+	assert result.final_facts == {"A", "B", "NOT B", "NOT NOT A"}
+	assert result.contradictions == detect_contradictions(result.final_facts)
+	assert result.contradictions == [("B", "Contradiction between B and NOT B")]
+
+
+def test_parser_interns_atoms() -> None:
+	f = parse_formula("Fever AND (Fever OR Cough)")
+	assert f.left is f.right.left
+	assert f.right.right is parse_formula("Cough OR Fever").left
+
+
+def test_loaded_rules_are_precompiled_for_forward_chain() -> None:
+	import pickle
+
+	data = {
+		"medical": [
+			{"id": "R1", "premise": "Fever AND Cough", "conclusion": "Flu", "text": ""},
+			{"id": "R2", "premise": "Flu OR Rash", "conclusion": "Rest", "text": ""},
+		]
+	}
+	rules = load_rules_from_json(data, "medical")
+	assert all(r._compiled is not None for r in rules)
+	result = forward_chain({"Fever", "Cough", "NOT Rest"}, rules)
+	assert result.final_facts == {"Fever", "Cough", "NOT Rest", "Flu", "Rest"}
+	assert result.contradictions == [("Rest", "Contradiction between Rest and NOT Rest")]
+	restored = pickle.loads(pickle.dumps(rules))
+	assert restored[0]._compiled is None
+	assert forward_chain({"Fever", "Cough"}, restored).final_facts == {"Fever", "Cough", "Flu", "Rest"}
+	rules[0].premise = Atom("Sneeze")
+	assert forward_chain({"Fever", "Cough"}, rules).final_facts == {"Fever", "Cough"}
+	rules[0].conclusion = parse_formula("Cold")
+	assert backward_chain("Cold", {"Sneeze"}, rules).succeeded
+
+
+def test_tokenize_symbols_and_rejects_unknown_characters() -> None:
+	kinds = [t.kind for t in tokenize("a&b|~c<->d->(e xor f)")]
+	assert kinds == [
+		"IDENT", "AND", "IDENT", "OR", "NOT", "IDENT", "IFF", "IDENT",
+		"IMPLIES", "(", "IDENT", "XOR", "IDENT", ")", "EOF",
+	]
+	try:
+		tokenize("A $ B")
+		message = ""
+	except ParseError as exc:
+		message = str(exc)
+	assert message == "Unexpected character '$' at position 2."
+
+
+def test_parse_formula_results_are_cached() -> None:
+	clear_parser_cache()
+	first = parse_formula("A AND B")
+	assert parse_formula("A AND B") is first
+	assert parse_formula.cache_info().hits == 1
+	formula_to_str(first)
+	clear_parser_cache()
+	assert formula_to_str.cache_info().currsize == 0
+	assert tokenize.cache_info().currsize == 0
+	second = parse_formula("A AND B")
+	assert second is not first
+	assert second == first
+
+
+def test_formula_to_str_handles_deep_formulas() -> None:
+	f: Formula = Atom("A")
+	for _ in range(5000):
+		f = And(f, Not(Atom("B")))
+	text = formula_to_str(f)
+	assert text.startswith("A AND NOT B AND NOT B")
+	assert text.count("NOT B") == 5000
+
+
+def test_formula_to_str_handles_equal_deep_formulas() -> None:
+	def build() -> Formula:
+		f: Formula = Atom("A")
+		for _ in range(5000):
+			f = And(f, Not(Atom("B")))
+		return f
+
+	first, second = build(), build()
+	assert first == second and first is not second
+	assert first != And(first, Atom("C")) and And(first, Atom("C")) != And(second, Atom("D"))
+	assert formula_to_str(first) == formula_to_str(second)
+
+
+def test_scanned_tokenizer_matches_regex_tokenizer() -> None:
+	from parser import _NUMBA_MIN_LENGTH, _tokenize_scanned
+
+	text = "(Atom1 or NOT B_2 -> C3) <-> ~D4&E|F xor\tG"
+	assert len(text) < _NUMBA_MIN_LENGTH
+	assert _tokenize_scanned(text) == tokenize(text)
+	try:
+		_tokenize_scanned("A <- B")
+		message = ""
+	except ParseError as exc:
+		message = str(exc)
+	assert message == "Unexpected character '<' at position 2."